@@ -6,6 +6,10 @@ from datetime import datetime
 from scipy.stats import linregress  # For beta calculation
 from secret import CIONGECKO_API_TOKEN
 import time
+import json
+import os
+
+BETA_CACHE_FILE = "beta_cache.json"  # Memoized beta results, keyed by coin, benchmark and window
 
 def get_coin_historical_prices(days, coin, retries = 5):
         """Fetches historical prices for a given coin from CoinGecko API."""
@@ -100,6 +104,46 @@ def get_beta(token_coin, benchmark = "bitcoin", days=365, max_retries=5):
     print(f'Beta calculated for {token_coin}...')
     return df, beta
 
+def get_beta_cached(token_coin, benchmark = "bitcoin", days=365, max_retries=5, cache_file=BETA_CACHE_FILE):
+    """
+    Returns the beta of the token compared to the benchmark, reusing the last computed
+    value when the inputs have not changed.
+
+    Results are memoized by (coin, benchmark, days, last input date). CoinGecko daily data
+    ends at the current UTC date, so the beta is only recalculated once a new daily
+    candle exists. Failed calculations are not cached.
+
+    Parameters:
+        token_coin (str): The token symbol (e.g., "aave", "ethereum").
+        benchmark (str): Benchmark the token is compared to (default: 'bitcoin').
+        days (int): Number of past days to fetch data for (default: 365).
+        max_retries (int): Maximum number of retries for failed API calls (default: 5).
+        cache_file (str): Path to the JSON cache file (default: 'beta_cache.json').
+
+    Returns:
+        float: Beta value, or None on failure.
+    """
+    cache = {}
+    if os.path.exists(cache_file):
+        with open(cache_file, "r") as f:
+            cache = json.load(f)
+
+    key = f"{token_coin}|{benchmark}|{days}"
+    last_input_date = datetime.utcnow().strftime('%Y-%m-%d')
+    cached = cache.get(key)
+    if cached and cached["last_input_date"] == last_input_date:
+        print(f'Using cached beta for {token_coin} ({last_input_date})...')
+        return cached["beta"]
+
+    _, beta = get_beta(token_coin, benchmark, days, max_retries)
+    if beta is None:
+        return None
+
+    cache[key] = {"last_input_date": last_input_date, "beta": float(beta)}
+    with open(cache_file, "w") as f:
+        json.dump(cache, f, indent=2)
+    return float(beta)
+
 if __name__ == "__main__":
     # Test with one coin
     df, beta = get_beta("dogecoin")
@@ -1,6 +1,6 @@
 import requests
 from datetime import datetime, timedelta
-from googlesheets_function import write_to_google_sheet
+from googlesheets_function import write_to_google_sheet, write_changed_to_google_sheet
 import gspread
 from oauth2client.service_account import ServiceAccountCredentials
 
@@ -10,6 +10,63 @@ CREDENTIALS_FILE = "credentials.json"  # Path to your Google credentials file
 SPREADSHEET_NAME = "historical_prices_daily"  # Name of the Google Sheet
 MAX_LIMIT = 1000  # Binance API limit per request
 
+def fetch_binance_klines(symbol, start_time_ms, end_time_ms, api_key=None):
+    """
+    Fetch daily klines from Binance API for a given time range, paginating in
+    MAX_LIMIT day chunks.
+
+    Parameters:
+    - symbol (str): Binance trading pair (e.g., "BTCUSDT").
+    - start_time_ms (int): Start of the range in milliseconds since epoch.
+    - end_time_ms (int): End of the range in milliseconds since epoch (inclusive).
+    - api_key (str, optional): Binance API key.
+
+    Returns:
+    - list of lists: Rows as [date (mm/dd/yyyy), open, high, low, close, volume].
+    """
+    # Calculate number of requests needed
+    day_ms = 86400 * 1000
+    days = (end_time_ms - start_time_ms + day_ms - 1) // day_ms  # Days spanned by the range
+    total_requests = (days + MAX_LIMIT - 1) // MAX_LIMIT  # Ceiling division
+    all_klines = []
+    
+    for i in range(total_requests):
+        # Calculate time range for this chunk
+        chunk_start_ms = start_time_ms + (i * MAX_LIMIT * 86400 * 1000)  # 86400s = 1 day
+        chunk_end_ms = min(chunk_start_ms + (MAX_LIMIT * 86400 * 1000) - 1, end_time_ms)
+        
+        # Binance API endpoint for this chunk
+        klines_url = (
+            f"https://data-api.binance.vision/api/v3/klines?"
+            f"symbol={symbol}&interval=1d&limit={MAX_LIMIT}&"
+            f"startTime={chunk_start_ms}&endTime={chunk_end_ms}"
+        )
+        
+        # Headers with optional API key
+        headers = {"X-MBX-APIKEY": api_key} if api_key else {}
+        
+        # Fetch klines data
+        print(f"Fetching chunk {i + 1}/{total_requests} for {symbol}...")
+        klines_response = requests.get(klines_url, headers=headers)
+        klines_response.raise_for_status()
+        klines_data = klines_response.json()
+        
+        if klines_data:
+            all_klines.extend(klines_data)
+    
+    rows = []
+    for kline in all_klines:
+        timestamp_ms = kline[0]  # Open time in milliseconds
+        date = datetime.utcfromtimestamp(timestamp_ms / 1000).strftime(f'%m/%d/%Y')
+        open_price = float(kline[1])
+        high = float(kline[2])
+        low = float(kline[3])
+        close = float(kline[4])
+        volume = float(kline[5]) # Volume * Close price for USDT value
+        
+        rows.append([date, open_price, high, low, close, volume])
+    return rows
+
 def get_binance_crypto_ohlc(symbol='BTC', api_key=None, days=6000):
     """
     Fetch OHLC data for multiple days from Binance API with pagination. 
@@ -36,50 +93,12 @@ def get_binance_crypto_ohlc(symbol='BTC', api_key=None, days=6000):
         start_time_ms = int(start_time.timestamp() * 1000)
         end_time_ms = int(end_time.timestamp() * 1000)
         
-        # Calculate number of requests needed
-        total_requests = (days + MAX_LIMIT - 1) // MAX_LIMIT  # Ceiling division
-        all_klines = []
-        
-        for i in range(total_requests):
-            # Calculate time range for this chunk
-            chunk_start_ms = start_time_ms + (i * MAX_LIMIT * 86400 * 1000)  # 86400s = 1 day
-            chunk_end_ms = min(chunk_start_ms + (MAX_LIMIT * 86400 * 1000) - 1, end_time_ms)
-            
-            # Binance API endpoint for this chunk
-            klines_url = (
-                f"https://data-api.binance.vision/api/v3/klines?"
-                f"symbol={symbol}&interval=1d&limit={MAX_LIMIT}&"
-                f"startTime={chunk_start_ms}&endTime={chunk_end_ms}"
-            )
-            
-            # Headers with optional API key
-            headers = {"X-MBX-APIKEY": api_key} if api_key else {}
-            
-            # Fetch klines data
-            print(f"Fetching chunk {i + 1}/{total_requests} for {symbol}...")
-            klines_response = requests.get(klines_url, headers=headers)
-            klines_response.raise_for_status()
-            klines_data = klines_response.json()
-            
-            if klines_data:
-                all_klines.extend(klines_data)
-        
-        # Prepare data for Google Sheets
+        # Fetch klines for the full window and prepare data for Google Sheets
         sheet_data = [["Date", "Open", "High", "Low", "Close", "Volume (USDT)"]]  # Header
-        for kline in all_klines:
-            timestamp_ms = kline[0]  # Open time in milliseconds
-            date = datetime.utcfromtimestamp(timestamp_ms / 1000).strftime(f'%m/%d/%Y')
-            open_price = float(kline[1])
-            high = float(kline[2])
-            low = float(kline[3])
-            close = float(kline[4])
-            volume = float(kline[5]) # Volume * Close price for USDT value
-            
-            row = [date, open_price, high, low, close, volume]
-            sheet_data.append(row)
+        sheet_data.extend(fetch_binance_klines(symbol, start_time_ms, end_time_ms, api_key=api_key))
         
-        # Write to Google Sheet
-        write_to_google_sheet(
+        # Write only the rows that changed since the last run to Google Sheet
+        write_changed_to_google_sheet(
             spreadsheet_name=SPREADSHEET_NAME,
             data=sheet_data,
             target_sheet=symbol,  # Use symbol as worksheet name
@@ -1,6 +1,6 @@
 import requests
 from datetime import datetime, timedelta
-from googlesheets_function import write_to_google_sheet
+from googlesheets_function import write_to_google_sheet, write_changed_to_google_sheet
 import gspread
 from oauth2client.service_account import ServiceAccountCredentials
 
@@ -9,6 +9,66 @@ CREDENTIALS_FILE = "credentials.json"  # Path to your Google credentials file
 SPREADSHEET_NAME = "historical_prices_daily"  # Name of the Google Sheet
 MAX_LIMIT = 300  # Coinbase API limit per request (max 300 candles)
 
+def fetch_coinbase_candles(symbol, start_time, end_time):
+    """
+    Fetch daily candles from Coinbase API for a given time range, paginating in
+    MAX_LIMIT day chunks. Coinbase may omit days without trades, so the result
+    can be sparse.
+
+    Parameters:
+    - symbol (str): Coinbase product id (e.g., "ETH-USD").
+    - start_time (datetime): Start of the range (UTC).
+    - end_time (datetime): End of the range (UTC, inclusive).
+
+    Returns:
+    - list of lists: Rows sorted by date as [date (mm/dd/yyyy), open, high, low, close, volume].
+    """
+    # Calculate number of requests needed
+    days = -(-(end_time - start_time) // timedelta(days=1))  # Days spanned by the range
+    total_requests = (days + MAX_LIMIT - 1) // MAX_LIMIT  # Ceiling division
+    all_candles = []
+    
+    for i in range(total_requests):
+        # Calculate time range for this chunk
+        chunk_start = start_time + timedelta(days=i * MAX_LIMIT)
+        chunk_end = min(chunk_start + timedelta(days=MAX_LIMIT - 1), end_time)
+        
+        # Coinbase API requires ISO 8601 format for timestamps
+        chunk_start_iso = chunk_start.isoformat()
+        chunk_end_iso = chunk_end.isoformat()
+        
+        # Coinbase API endpoint for this chunk
+        candles_url = (
+            f"https://api.exchange.coinbase.com/products/{symbol}/candles?"
+            f"granularity=86400&"  # 86400 seconds = 1 day
+            f"start={chunk_start_iso}&end={chunk_end_iso}"
+        )
+        
+        # Fetch candles data
+        print(f"Fetching chunk {i + 1}/{total_requests} for {symbol}...")
+        candles_response = requests.get(candles_url)
+        candles_response.raise_for_status()
+        candles_data = candles_response.json()
+        
+        if candles_data:  # Only extend if data is returned
+            all_candles.extend(candles_data)
+    
+    # Sort candles by timestamp (Coinbase returns in descending order)
+    all_candles.sort(key=lambda x: x[0])  # Sort by timestamp (ascending)
+    
+    rows = []
+    for candle in all_candles:
+        timestamp = candle[0]  # Unix timestamp in seconds
+        date = datetime.utcfromtimestamp(timestamp).strftime(f'%m/%d/%Y')
+        low = float(candle[1])      # Low
+        high = float(candle[2])     # High
+        open_price = float(candle[3])  # Open
+        close = float(candle[4])    # Close
+        volume = float(candle[5])   # Volume * Close price for USD value
+        
+        rows.append([date, open_price, high, low, close, volume])
+    return rows
+
 def get_coinbase_crypto_ohlc(symbol='ETH', days=6000):
     """
     Fetch OHLC data for multiple days from Coinbase API with pagination.
@@ -32,58 +92,12 @@ def get_coinbase_crypto_ohlc(symbol='ETH', days=6000):
         end_time = now_utc.replace(hour=23, minute=59, second=59, microsecond=999999)
         start_time = end_time - timedelta(days=days)
         
-        # Coinbase API requires ISO 8601 format for timestamps
-        start_time_iso = start_time.isoformat()
-        end_time_iso = end_time.isoformat()
-        
-        # Calculate number of requests needed
-        total_requests = (days + MAX_LIMIT - 1) // MAX_LIMIT  # Ceiling division
-        all_candles = []
-        
-        for i in range(total_requests):
-            # Calculate time range for this chunk
-            chunk_start = start_time + timedelta(days=i * MAX_LIMIT)
-            chunk_end = min(chunk_start + timedelta(days=MAX_LIMIT - 1), end_time)
-            
-            # Convert to ISO 8601
-            chunk_start_iso = chunk_start.isoformat()
-            chunk_end_iso = chunk_end.isoformat()
-            
-            # Coinbase API endpoint for this chunk
-            candles_url = (
-                f"https://api.exchange.coinbase.com/products/{symbol}/candles?"
-                f"granularity=86400&"  # 86400 seconds = 1 day
-                f"start={chunk_start_iso}&end={chunk_end_iso}"
-            )
-            
-            # Fetch candles data
-            print(f"Fetching chunk {i + 1}/{total_requests} for {symbol}...")
-            candles_response = requests.get(candles_url)
-            candles_response.raise_for_status()
-            candles_data = candles_response.json()
-            
-            if candles_data:  # Only extend if data is returned
-                all_candles.extend(candles_data)
-        
-        # Sort candles by timestamp (Coinbase returns in descending order)
-        all_candles.sort(key=lambda x: x[0])  # Sort by timestamp (ascending)
-        
-        # Prepare data for Google Sheets
+        # Fetch candles for the full window and prepare data for Google Sheets
         sheet_data = [["Date", "Open", "High", "Low", "Close", "Volume (USDT)"]]  # Header
-        for candle in all_candles:
-            timestamp = candle[0]  # Unix timestamp in seconds
-            date = datetime.utcfromtimestamp(timestamp).strftime(f'%m/%d/%Y')
-            low = float(candle[1])      # Low
-            high = float(candle[2])     # High
-            open_price = float(candle[3])  # Open
-            close = float(candle[4])    # Close
-            volume = float(candle[5])   # Volume * Close price for USD value
-            
-            row = [date, open_price, high, low, close, volume]
-            sheet_data.append(row)
+        sheet_data.extend(fetch_coinbase_candles(symbol, start_time, end_time))
         
-        # Write to Google Sheet
-        write_to_google_sheet(
+        # Write only the rows that changed since the last run to Google Sheet
+        write_changed_to_google_sheet(
             spreadsheet_name=SPREADSHEET_NAME,
             data=sheet_data,
             target_sheet=symbol.replace('-USD', 'USDT'),  # Use base symbol (e.g., ETH) as worksheet name
@@ -1,6 +1,10 @@
 # google_sheets_writer.py
 import pandas as pd
+import json
+import os
+import hashlib
 import gspread  # Library to interact with Google Sheets
+from gspread.utils import a1_to_rowcol, rowcol_to_a1  # Convert between A1 notation and row/col numbers
 from oauth2client.service_account import ServiceAccountCredentials  # Handles authentication with Google APIs
 
 def get_coin_list_from_google_sheet(spreadsheet_name, credentials_file = 'credentials.json', coins_sheet='Coins' ):
@@ -15,18 +19,17 @@ def get_coin_list_from_google_sheet(spreadsheet_name, credentials_file = 'creden
     coins = sheet.col_values(1)[1:]  # Skip header row
     return [coin for coin in coins if coin]  # Filter out empty cells
 
-def write_to_google_sheet(spreadsheet_name, data, target_sheet=None, range_name=None, credentials_file='credentials.json'):
+def _open_worksheet(spreadsheet_name, target_sheet=None, credentials_file='credentials.json'):
     """
-    Write data to a specific sheet and range in a Google Sheet document.
+    Open a worksheet (tab) in a Google Sheet document, creating the document or the worksheet if missing.
     
     Parameters:
-    - spreadsheet_name (str): The name of the Google Sheet document (e.g., "Beta Scores First Test").
-    - data (list of lists): The data to write, where each inner list is a row (e.g., [["Hello", "World", 4]]).
-    - target_sheet (str or int, optional): The name (e.g., "Sheet2") or index (e.g., 1) of the specific sheet/tab.
-                                          If None, defaults to the first sheet.
-    - range_name (str, optional): The range to write to in A1 notation (e.g., "A1:C2"). 
-                                  If None, data is appended as new rows.
-    - credentials_file (str): Path to the JSON credentials file downloaded from Google Cloud (default: 'credentials.json').
+    - spreadsheet_name (str): The name of the Google Sheet document.
+    - target_sheet (str or int, optional): The name or 0-based index of the sheet/tab. If None, the first sheet.
+    - credentials_file (str): Path to the JSON credentials file (default: 'credentials.json').
+    
+    Returns:
+    - gspread.Worksheet: The opened worksheet.
     """
     # Define the scope of access for the Google Sheets and Drive APIs
     # These URLs specify what permissions the script needs (read/write sheets and access Drive)
@@ -65,6 +68,23 @@ def write_to_google_sheet(spreadsheet_name, data, target_sheet=None, range_name=
             sheet = spreadsheet.add_worksheet(title=target_sheet, rows=10000, cols=10)
             print(f"Created new worksheet: {target_sheet} in {spreadsheet_name}")
 
+    return sheet
+
+def write_to_google_sheet(spreadsheet_name, data, target_sheet=None, range_name=None, credentials_file='credentials.json'):
+    """
+    Write data to a specific sheet and range in a Google Sheet document.
+    
+    Parameters:
+    - spreadsheet_name (str): The name of the Google Sheet document (e.g., "Beta Scores First Test").
+    - data (list of lists): The data to write, where each inner list is a row (e.g., [["Hello", "World", 4]]).
+    - target_sheet (str or int, optional): The name (e.g., "Sheet2") or index (e.g., 1) of the specific sheet/tab.
+                                          If None, defaults to the first sheet.
+    - range_name (str, optional): The range to write to in A1 notation (e.g., "A1:C2"). 
+                                  If None, data is appended as new rows.
+    - credentials_file (str): Path to the JSON credentials file downloaded from Google Cloud (default: 'credentials.json').
+    """
+    sheet = _open_worksheet(spreadsheet_name, target_sheet, credentials_file)
+
     # Check if a specific range is provided
     if range_name:
         # Write data to the specified range (e.g., "A1:C2")
@@ -80,7 +100,95 @@ def write_to_google_sheet(spreadsheet_name, data, target_sheet=None, range_name=
         sheet.format(f"A1:A{len(data)}", {"numberFormat": {"type": "DATE", "pattern": "dd/mm/yyyy"}})
         print(f"Data appended successfully to '{sheet.title}' in {spreadsheet_name}!")
 
-def get_coin_historical_prices_from_google_sheets(spreadsheet_name, coin = 'BTC', credentials_file='credentials.json'):
+PUBLISHED_CELLS_FILE = "published_cells.json"  # Row hashes of the last data published to each range
+
+def row_hash(row):
+    """Return a short, stable hash of a row's values, used to detect changed rows."""
+    return hashlib.md5(json.dumps(row, default=str).encode()).hexdigest()
+
+def get_last_published_data(spreadsheet_name, target_sheet, range_name, snapshot_file=PUBLISHED_CELLS_FILE):
+    """
+    Return the last data published to a range by write_changed_to_google_sheet(),
+    as a dict with 'rows' (list of row hashes) and 'first_row' (the first row's values).
+    Returns None if nothing was published to this range yet.
+    """
+    if not os.path.exists(snapshot_file):
+        return None
+    with open(snapshot_file, "r") as f:
+        snapshots = json.load(f)
+    return snapshots.get(f"{spreadsheet_name}|{target_sheet}|{range_name.split(':')[0]}")
+
+def write_changed_to_google_sheet(spreadsheet_name, data, target_sheet, range_name, credentials_file='credentials.json', snapshot_file=PUBLISHED_CELLS_FILE):
+    """
+    Write only the rows that changed since the last publish to a range in a Google Sheet.
+    
+    The last published data is kept as one hash per row in snapshot_file, keyed by spreadsheet,
+    sheet and the range's top-left cell. Contiguous changed rows are grouped and sent in a single
+    batch update. Rows that were published before but are no longer in data are blanked.
+    If nothing changed, no Sheets API call is made. The date format is applied to column A
+    only on the first publish of a range that starts in column A.
+    
+    Parameters:
+    - spreadsheet_name (str): The name of the Google Sheet document.
+    - data (list of lists): The data to write, where each inner list is a row.
+    - target_sheet (str): The name of the specific sheet/tab.
+    - range_name (str): The range to write to in A1 notation (e.g., "F4:G" or "A1:F100"). Only the
+                        top-left cell is used, the size comes from data.
+    - credentials_file (str): Path to the JSON credentials file (default: 'credentials.json').
+    - snapshot_file (str): Path to the JSON file holding the published row hashes (default: 'published_cells.json').
+    
+    Returns:
+    - int: Number of rows written.
+    """
+    key = f"{spreadsheet_name}|{target_sheet}|{range_name.split(':')[0]}"
+    snapshots = {}
+    if os.path.exists(snapshot_file):
+        with open(snapshot_file, "r") as f:
+            snapshots = json.load(f)
+    first_publish = key not in snapshots
+    previous_rows = snapshots.get(key, {}).get("rows", [])
+
+    # Hash every row so the snapshot stays small for long price histories
+    row_hashes = [row_hash(row) for row in data]
+    width = max((len(row) for row in data), default=0)
+
+    # Rows that differ from the last publish, plus previously published rows to blank out
+    changed = [i for i, h in enumerate(row_hashes) if i >= len(previous_rows) or previous_rows[i] != h]
+    changed += list(range(len(row_hashes), len(previous_rows)))
+    if not changed:
+        print(f"No changes to write to '{target_sheet}' in {spreadsheet_name}.")
+        return 0
+
+    # Group contiguous changed rows into blocks, each written as one range
+    start_row, start_col = a1_to_rowcol(range_name.split(':')[0])
+    blocks = []
+    for i in changed:
+        if blocks and blocks[-1][-1] == i - 1:
+            blocks[-1].append(i)
+        else:
+            blocks.append([i])
+    updates = []
+    for block in blocks:
+        values = [list(data[i]) + [""] * (width - len(data[i])) if i < len(data) else [""] * width for i in block]
+        updates.append({
+            "range": f"{rowcol_to_a1(start_row + block[0], start_col)}:{rowcol_to_a1(start_row + block[-1], start_col + width - 1)}",
+            "values": values
+        })
+
+    sheet = _open_worksheet(spreadsheet_name, target_sheet, credentials_file)
+    sheet.batch_update(updates)
+    # Format the date column once, when a range starting in column A is first published
+    if first_publish and start_col == 1:
+        sheet.format(f"A{start_row}:A{start_row + len(data) - 1}", {"numberFormat": {"type": "DATE", "pattern": "dd/mm/yyyy"}})
+    print(f"Wrote {len(changed)} changed rows in {len(updates)} ranges to '{sheet.title}' in {spreadsheet_name}!")
+
+    # Only remember what was published once the write succeeded
+    snapshots[key] = {"rows": row_hashes, "first_row": list(data[0]) if data else []}
+    with open(snapshot_file, "w") as f:
+        json.dump(snapshots, f)
+    return len(changed)
+
+def get_coin_historical_prices_from_google_sheets(spreadsheet_name, coin = 'BTC', credentials_file='credentials.json', value_render_option='FORMATTED_VALUE'):
     """
     Fetch historical price data for a specific coin from a Google Sheet named '{coin}USDT'.
     Reminder! The coin should exists in the google sheet coins list.
@@ -89,6 +197,8 @@ def get_coin_historical_prices_from_google_sheets(spreadsheet_name, coin = 'BTC'
     - coin (str): The coin symbol (e.g., "BTC" for Bitcoin)
     - sheet_name (str): The name of the Google Sheet document containing the coin sheets
     - credentials_file (str): Path to the JSON credentials file (default: 'credentials.json')
+    - value_render_option (str): 'FORMATTED_VALUE' returns the displayed values, 'UNFORMATTED_VALUE' returns
+                                 the stored values, e.g. full precision prices (default: 'FORMATTED_VALUE')
     
     Returns:
     - pandas.DataFrame: Historical price data with columns:
@@ -119,7 +229,7 @@ def get_coin_historical_prices_from_google_sheets(spreadsheet_name, coin = 'BTC'
         return pd.DataFrame()  # Return empty DataFrame
     
     # Get all data from the sheet
-    data = sheet.get("A:F")
+    data = sheet.get("A:F", value_render_option=value_render_option)
     
     # Check if there's any data
     if not data or len(data) < 2:  # Less than 2 rows means no data beyond header
@@ -1,5 +1,5 @@
-from beta_compared_to_benchmark import get_beta, get_coin_historical_prices
-from googlesheets_function import write_to_google_sheet, get_coin_list_from_google_sheet
+from beta_compared_to_benchmark import get_beta_cached, get_coin_historical_prices
+from googlesheets_function import write_to_google_sheet, write_changed_to_google_sheet, get_coin_list_from_google_sheet, get_last_published_data, row_hash
 import time
 from datetime import datetime  # Import datetime for current timestamp
 # List of coins to analyze
@@ -34,8 +34,8 @@ def fetch_beta_scores_to_google_sheet(SPREADSHEET_NAME = 'Beta Scores First Test
     - BENCHMARK = ['bitcoin', 'BTC']
     
     - get_coin_list_from_google_sheet()
-    - get_beta() -> For each coin
-    - write_to_google_sheet() -> Write the beta calculated for each coin to a google sheet
+    - get_beta_cached() -> For each coin, "N/A" if it fails
+    - write_changed_to_google_sheet() -> Write the changed beta rows to a google sheet
     """
 
     # Fetch coin IDs from Google Sheet
@@ -43,27 +43,41 @@ def fetch_beta_scores_to_google_sheet(SPREADSHEET_NAME = 'Beta Scores First Test
     print(f"Fetched coins: {coins_list}")
 
     # Fetch beta values for each coin with rounding to 4 decimal places
-    coins_beta = [(coin, round(float(get_beta(coin,BENCHMARK[0])[1]), 4)) for coin in coins_list]
+    # Betas are memoized, so they are only recalculated once a new daily candle exists
+    coins_beta = []
+    for coin in coins_list:
+        beta = get_beta_cached(coin, BENCHMARK[0])
+        # Keep the coin's row with "N/A" if the beta could not be calculated
+        coins_beta.append((coin, round(beta, 4) if beta is not None else "N/A"))
     print(f"Beta values (raw): {coins_beta}")
 
-    # Get current datetime as a string
-    current_datetime = datetime.now().strftime("%d-%m-%Y %H:%M:%S")
-
-    # Prepare data with headers
-    beta_data = [
-        ["Updated", current_datetime],  # Header row with timestamp
+    # Column headers and data rows
+    beta_rows = [
         ["Coin", f"Beta/{BENCHMARK[1]} "]               # Column headers for data
     ] + [[coin, beta] for coin, beta in coins_beta]  # Data rows
 
+    # Keep the last "Updated" timestamp if no beta changed since the last publish
+    previous = get_last_published_data(SPREADSHEET_NAME, TARGET_SHEET_NAME, RANGE_NAME)
+    if previous and previous["rows"][1:] == [row_hash(row) for row in beta_rows]:
+        updated_row = previous["first_row"]
+    else:
+        # Get current datetime as a string
+        current_datetime = datetime.now().strftime("%d-%m-%Y %H:%M:%S")
+        updated_row = ["Updated", current_datetime]  # Header row with timestamp
+
+    # Prepare data with headers
+    beta_data = [updated_row] + beta_rows
+
     print(f"Beta data with headers: {beta_data}")
 
-    # Write beta values to Google Sheet starting at A1 (to include headers)
+    # Write only the changed beta values to Google Sheet
     print('Trying to write to google sheets...')
-    write_to_google_sheet(
+    write_changed_to_google_sheet(
         spreadsheet_name = SPREADSHEET_NAME,
         data = beta_data,
         target_sheet = TARGET_SHEET_NAME,
-        range_name= RANGE_NAME  # Adjust range to include headers
+        range_name = RANGE_NAME,
+        credentials_file = CREDENTIALS_FILE
     )
     print('Successfully writen to google sheets.')
 
@@ -0,0 +1,267 @@
+import numpy as np
+import pandas as pd
+import json
+import os
+from datetime import timedelta
+from googlesheets_function import write_changed_to_google_sheet, get_coin_historical_prices_from_google_sheets
+from fetch_crypto_prices_BINANCE import fetch_binance_klines, MAX_LIMIT as BINANCE_MAX_LIMIT
+from fetch_crypto_prices_COINBASE import fetch_coinbase_candles, MAX_LIMIT as COINBASE_MAX_LIMIT
+
+# Configuration
+CREDENTIALS_FILE = "credentials.json"  # Path to your Google credentials file
+SPREADSHEET_NAME = "historical_prices_daily"  # Name of the Google Sheet
+DATE_FORMAT = '%m/%d/%Y'  # Date format written by the exchange fetchers
+EXPECTED_COLUMNS = ['Date', 'Open', 'High', 'Low', 'Close', 'Volume (USDT)']  # Header written by the exchange fetchers
+EMPTY_DAYS_FILE = "empty_price_days.json"  # Days the exchange returned no candle for, per exchange and coin
+
+def load_empty_days(coin, exchange, empty_days_file=EMPTY_DAYS_FILE):
+    """Return the days (YYYY-MM-DD) the exchange returned no data for on earlier repairs."""
+    if not os.path.exists(empty_days_file):
+        return []
+    with open(empty_days_file, "r") as f:
+        return json.load(f).get(f"{exchange}|{coin}", [])
+
+def save_empty_days(coin, exchange, days, empty_days_file=EMPTY_DAYS_FILE):
+    """Add days (YYYY-MM-DD) the exchange returned no data for, so later scans skip them."""
+    empty_days = {}
+    if os.path.exists(empty_days_file):
+        with open(empty_days_file, "r") as f:
+            empty_days = json.load(f)
+    key = f"{exchange}|{coin}"
+    empty_days[key] = sorted(set(empty_days.get(key, [])) | set(days))
+    with open(empty_days_file, "w") as f:
+        json.dump(empty_days, f, indent=2)
+
+def normalize_sheet_dates(dates):
+    """
+    Convert dates read with value_render_option='UNFORMATTED_VALUE' to DATE_FORMAT strings.
+    Cells holding real dates come back as serial numbers (days since 1899-12-30), text dates
+    written by the fetchers are kept as they are.
+    """
+    serials = pd.to_numeric(dates, errors='coerce')
+    as_dates = pd.to_datetime(serials, unit='D', origin='1899-12-30').dt.strftime(DATE_FORMAT)
+    return as_dates.where(serials.notna(), dates)
+
+def scan_price_gaps(df, date_column='Date', date_format=DATE_FORMAT, known_empty_days=None):
+    """
+    Scan a stored daily price series for missing days, duplicate rows and
+    non-monotonic timestamps. The scan is vectorized over the whole column.
+    Days listed in known_empty_days are not reported as missing.
+
+    Parameters:
+    - df (pandas.DataFrame): Price data as returned by get_coin_historical_prices_from_google_sheets().
+    - date_column (str): Name of the date column (default: 'Date').
+    - date_format (str): strftime format of the stored dates (default: '%m/%d/%Y').
+    - known_empty_days (list of str, optional): Days (YYYY-MM-DD) known to have no data on the exchange.
+
+    Returns:
+    - dict with keys:
+        - 'missing_windows' (list of tuples): (start, end) Timestamps of each run of missing days, inclusive.
+        - 'missing_days' (int): Total number of missing days.
+        - 'duplicate_rows' (list of int): Row positions whose date already appeared earlier.
+        - 'non_monotonic_rows' (list of int): Row positions whose date is earlier than the previous row.
+        - 'invalid_rows' (list of int): Row positions whose date could not be parsed.
+    """
+    dates = pd.to_datetime(df[date_column], format=date_format, errors='coerce').dt.normalize()
+    valid = dates.notna().to_numpy()
+    positions = np.arange(len(dates))
+    days = dates.to_numpy(dtype='datetime64[D]')
+
+    # Rows out of order compared to the previous valid row
+    valid_days = days[valid]
+    valid_positions = positions[valid]
+    non_monotonic = valid_positions[1:][np.diff(valid_days).astype(int) < 0]
+
+    # Rows repeating a date that already appeared
+    duplicates = valid_positions[pd.Series(valid_days).duplicated(keep='first').to_numpy()]
+
+    # Runs of missing days between consecutive unique dates, known empty days count as present
+    unique_days = np.unique(valid_days)
+    if known_empty_days and len(unique_days):
+        empty = np.array(known_empty_days, dtype='datetime64[D]')
+        empty = empty[(empty > unique_days[0]) & (empty < unique_days[-1])]
+        unique_days = np.union1d(unique_days, empty)
+    steps = np.diff(unique_days).astype(int)
+    gap_idx = np.flatnonzero(steps > 1)
+    window_starts = unique_days[gap_idx] + np.timedelta64(1, 'D')
+    window_ends = unique_days[gap_idx + 1] - np.timedelta64(1, 'D')
+
+    return {
+        'missing_windows': [(pd.Timestamp(s), pd.Timestamp(e)) for s, e in zip(window_starts, window_ends)],
+        'missing_days': int((steps[gap_idx] - 1).sum()),
+        'duplicate_rows': duplicates.tolist(),
+        'non_monotonic_rows': non_monotonic.tolist(),
+        'invalid_rows': positions[~valid].tolist(),
+    }
+
+def merge_windows_into_spans(missing_windows, max_days):
+    """
+    Merge missing windows into as few fetch spans as possible. Consecutive windows are
+    joined while the span stays within max_days, so many small holes cost one request.
+    A single window longer than max_days is kept as its own span (the fetchers paginate it).
+
+    Parameters:
+    - missing_windows (list of tuples): (start, end) Timestamps from scan_price_gaps(), sorted by date.
+    - max_days (int): Maximum number of days per request for the exchange.
+
+    Returns:
+    - list of tuples: (start, end) Timestamps of each span, inclusive.
+    """
+    spans = []
+    for start, end in missing_windows:
+        if spans and (end - spans[-1][0]).days + 1 <= max_days:
+            spans[-1] = (spans[-1][0], end)
+        else:
+            spans.append((start, end))
+    return spans
+
+def fetch_missing_windows(coin, missing_windows, exchange='binance', api_key=None):
+    """
+    Fetch only the missing date ranges for a coin from the given exchange.
+    Adjacent windows are fetched together in spans of up to the exchange's MAX_LIMIT days,
+    and only the rows for the missing dates are kept.
+
+    Parameters:
+    - coin (str): The coin symbol (e.g., "BTC").
+    - missing_windows (list of tuples): (start, end) Timestamps from scan_price_gaps().
+    - exchange (str): 'binance' or 'coinbase' (default: 'binance').
+    - api_key (str, optional): Binance API key.
+
+    Returns:
+    - list of lists: Rows as [date (mm/dd/yyyy), open, high, low, close, volume].
+    """
+    if exchange == 'binance':
+        max_days = BINANCE_MAX_LIMIT
+    elif exchange == 'coinbase':
+        max_days = COINBASE_MAX_LIMIT
+    else:
+        raise ValueError(f"Unsupported exchange: {exchange}")
+
+    missing_dates = set()
+    for start, end in missing_windows:
+        missing_dates.update(pd.date_range(start, end, freq='D').strftime(DATE_FORMAT))
+
+    rows = []
+    for start, end in merge_windows_into_spans(missing_windows, max_days):
+        # Cover the whole last day, as the full fetchers do
+        end_of_day = end + timedelta(days=1) - timedelta(milliseconds=1)
+        print(f"Fetching missing span {start.date()} - {end.date()} for {coin}...")
+        if exchange == 'binance':
+            rows.extend(fetch_binance_klines(
+                f"{coin}USDT",
+                start.value // 10**6,  # Naive Timestamps are UTC, .value is in nanoseconds
+                end_of_day.value // 10**6,
+                api_key=api_key
+            ))
+        else:
+            rows.extend(fetch_coinbase_candles(
+                f"{coin}-USD",
+                start.to_pydatetime(),
+                end_of_day.to_pydatetime()
+            ))
+
+    # Spans also cover days already stored, keep only the missing ones
+    return [row for row in rows if row[0] in missing_dates]
+
+def repair_price_gaps(spreadsheet_name=SPREADSHEET_NAME, coin='BTC', exchange='binance', api_key=None, credentials_file=CREDENTIALS_FILE, retry_empty_days=False, empty_days_file=EMPTY_DAYS_FILE):
+    """
+    Scan the stored '{coin}USDT' sheet for gaps, fetch only the missing windows
+    and merge them into the sheet in place. Duplicate rows are dropped and rows
+    are sorted by date. This replaces the full refetch when holes are suspected.
+
+    Days the exchange returns no data for (e.g., Coinbase days without trades) are saved
+    to empty_days_file and skipped on later runs, unless retry_empty_days is True.
+
+    Parameters:
+    - spreadsheet_name (str): The name of the Google Sheet document containing the coin sheets.
+    - coin (str): The coin symbol (e.g., "BTC").
+    - exchange (str): Exchange the sheet was filled from, 'binance' or 'coinbase' (default: 'binance').
+    - api_key (str, optional): Binance API key.
+    - credentials_file (str): Path to the JSON credentials file (default: 'credentials.json').
+    - retry_empty_days (bool): Fetch days saved as empty on earlier runs again (default: False).
+    - empty_days_file (str): Path to the JSON file of known empty days (default: 'empty_price_days.json').
+
+    Returns:
+    - pandas.DataFrame: The repaired price data (empty if the sheet could not be read or the repair failed).
+    """
+    try:
+        # Read the stored values, not the displayed ones, so rows written back keep full precision
+        df = get_coin_historical_prices_from_google_sheets(spreadsheet_name, coin, credentials_file, value_render_option='UNFORMATTED_VALUE')
+        if df.empty:
+            return df
+        if list(df.columns) != EXPECTED_COLUMNS:
+            print(f"Columns in '{coin}USDT' do not match {EXPECTED_COLUMNS}. Skipping repair.")
+            return df
+        df['Date'] = normalize_sheet_dates(df['Date'])
+
+        known_empty_days = [] if retry_empty_days else load_empty_days(coin, exchange, empty_days_file)
+        report = scan_price_gaps(df, known_empty_days=known_empty_days)
+        print(
+            f"{coin}: {report['missing_days']} missing days in {len(report['missing_windows'])} windows, "
+            f"{len(report['duplicate_rows'])} duplicate rows, "
+            f"{len(report['non_monotonic_rows'])} non-monotonic rows, "
+            f"{len(report['invalid_rows'])} invalid dates"
+        )
+        if report['invalid_rows']:
+            print(f"Warning: rows with unparseable dates will be dropped: {report['invalid_rows']}")
+
+        if not (report['missing_windows'] or report['duplicate_rows'] or report['non_monotonic_rows'] or report['invalid_rows']):
+            print(f"No gaps found for {coin}. Nothing to repair.")
+            return df
+
+        fetched_rows = fetch_missing_windows(coin, report['missing_windows'], exchange=exchange, api_key=api_key)
+        fetched_df = pd.DataFrame(fetched_rows, columns=EXPECTED_COLUMNS)
+
+        # Merge, keeping the stored row when a date appears more than once
+        merged = pd.concat([df, fetched_df], ignore_index=True)
+        merged['_day'] = pd.to_datetime(merged['Date'], format=DATE_FORMAT, errors='coerce')
+        merged = (
+            merged.dropna(subset=['_day'])
+            .drop_duplicates(subset='_day', keep='first')
+            .sort_values('_day', kind='stable')
+            .drop(columns='_day')
+            .reset_index(drop=True)
+        )
+
+        # Remember the days the exchange has no data for, so later runs don't fetch them again
+        fetched_dates = {row[0] for row in fetched_rows}
+        empty_days = [
+            day.strftime('%Y-%m-%d')
+            for start, end in report['missing_windows']
+            for day in pd.date_range(start, end, freq='D')
+            if day.strftime(DATE_FORMAT) not in fetched_dates
+        ]
+        if empty_days:
+            print(f"{len(empty_days)} days are still missing for {coin} (no data returned by {exchange}). Saved to {empty_days_file}.")
+            save_empty_days(coin, exchange, empty_days, empty_days_file)
+
+        # Blank out leftover rows if dropping duplicates shortened the sheet
+        sheet_data = [list(merged.columns)] + merged.values.tolist()
+        sheet_data += [[""] * len(merged.columns)] * (len(df) - len(merged))
+
+        write_changed_to_google_sheet(
+            spreadsheet_name=spreadsheet_name,
+            data=sheet_data,
+            target_sheet=f"{coin}USDT",
+            range_name=f"A1:F{len(sheet_data)}",
+            credentials_file=credentials_file
+        )
+        print(f"Merged {len(fetched_rows)} fetched rows into {coin}USDT.")
+        return merged
+
+    except Exception as e:
+        print(f"Error repairing price gaps for {coin}: {e}")
+        return pd.DataFrame()
+
+def main():
+    # Configuration
+    # Sheets filled from Binance and from Coinbase (e.g., GAL)
+    binance_coins = ['BTC', 'ETH', 'MAGIC']
+    coinbase_coins = ['GAL']
+    for coin in binance_coins:
+        repair_price_gaps(SPREADSHEET_NAME, coin, exchange='binance')
+    for coin in coinbase_coins:
+        repair_price_gaps(SPREADSHEET_NAME, coin, exchange='coinbase')
+
+if __name__ == "__main__":
+    main()